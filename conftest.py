@@ -0,0 +1,6 @@
+"""Make the src layout importable when running pytest from a checkout."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
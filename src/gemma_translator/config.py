@@ -1,30 +1,99 @@
 """Configuration management for Gemma Translator CLI."""
 
+import os
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import Any
-import yaml
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
-
-class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_prefix="GEMMA_", extra="ignore")
-    
-    model_name: str = Field(default="translategemma:12b", description="Ollama model name")
-    api_base: str = Field(default="http://localhost:11434", description="Ollama API base URL")
+
+_ENV_PREFIX = "GEMMA_"
+
+# A settings file holds a handful of scalars; anything bigger is a mistake
+# and not worth feeding to the parser
+_MAX_CONFIG_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Runtime configuration merged from defaults, environment, YAML, and CLI."""
+
+    model_name: str = "translategemma:12b"
+    api_base: str = "http://localhost:11434"
     source_lang: str = "English"
     source_code: str = "en"
     target_lang: str = "Spanish"
     target_code: str = "es"
-    context_size: int = Field(default=50000, gt=0, description="Ollama context window size in tokens")
-    chunk_size: int = Field(default=1000, gt=0, description="Maximum characters per chunk")
-    chunk_overlap: int = Field(default=0, ge=0, description="Overlapping characters between chunks")
+    context_size: int = 50000
+    chunk_size: int = 1000
+    chunk_overlap: int = 0
+    concurrency: int = 4
+    batch_chunks: int = 1
+
+    def __post_init__(self) -> None:
+        for name in ("context_size", "chunk_size", "concurrency", "batch_chunks"):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"{name} must be greater than 0")
+        if self.chunk_overlap < 0:
+            raise ValueError("chunk_overlap must be 0 or greater")
+
+
+_FIELD_NAMES = frozenset(f.name for f in fields(Settings))
+_INT_FIELDS = frozenset(f.name for f in fields(Settings) if f.type is int)
+
+
+def _env_overrides() -> dict[str, Any]:
+    """Collect GEMMA_*-prefixed settings from the environment."""
+    return {
+        name: os.environ[_ENV_PREFIX + name.upper()]
+        for name in _FIELD_NAMES
+        if _ENV_PREFIX + name.upper() in os.environ
+    }
+
+
+# Memoizes Settings per (path, mtime, overrides) so repeated invocations in
+# the same process skip the file read and validation
+_CONFIG_CACHE: dict[tuple, Settings] = {}
+
 
 def load_config(config_path: Path, cli_overrides: dict[str, Any] | None = None) -> Settings:
-    """Load and merge configuration from YAML, Env, and CLI."""
-    yaml_config = {}
-    if config_path.exists():
-        with open(config_path, "r", encoding="utf-8") as f:
-            yaml_config = yaml.safe_load(f) or {}
-    
+    """Load and merge configuration from a JSON/YAML file, Env, and CLI."""
     overrides = {k: v for k, v in (cli_overrides or {}).items() if v is not None}
-    return Settings(**{**yaml_config, **overrides})
\ No newline at end of file
+    cache_key = (
+        str(config_path),
+        config_path.stat().st_mtime_ns if config_path.exists() else 0,
+        tuple(sorted(overrides.items())),
+    )
+    cached = _CONFIG_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    file_config = {}
+    if config_path.exists():
+        if config_path.stat().st_size > _MAX_CONFIG_BYTES:
+            raise ValueError(f"Config file too large to be a settings file: {config_path}")
+        if config_path.suffix == ".json":
+            # stdlib json is far cheaper than any YAML parser
+            import json
+
+            file_config = json.loads(config_path.read_bytes()) or {}
+        else:
+            # Imported lazily so invocations without a config file skip the cost
+            import yaml
+
+            try:
+                # libyaml-backed parser, ~10x faster than the pure-Python loader
+                from yaml import CSafeLoader as SafeLoader
+            except ImportError:
+                from yaml import SafeLoader
+
+            with open(config_path, "r", encoding="utf-8") as f:
+                file_config = yaml.load(f, Loader=SafeLoader) or {}
+
+    merged = {**_env_overrides(), **file_config, **overrides}
+    known = {
+        k: (int(v) if k in _INT_FIELDS else v)
+        for k, v in merged.items()
+        if k in _FIELD_NAMES
+    }
+    settings = Settings(**known)
+    _CONFIG_CACHE[cache_key] = settings
+    return settings
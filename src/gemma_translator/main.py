@@ -4,22 +4,14 @@ Provides a Typer-based command-line interface with Rich progress bars
 and comprehensive error handling.
 """
 
+import mmap
 from pathlib import Path
 from typing import Annotated, Optional
 
 import typer
 from rich.console import Console
-from rich.progress import (
-    BarColumn,
-    Progress,
-    SpinnerColumn,
-    TaskProgressColumn,
-    TextColumn,
-    TimeElapsedColumn,
-)
 
 from .config import load_config
-from .translator import Translator
 
 app = typer.Typer(
     help="Translate large text documents using local LLM models through Ollama.",
@@ -43,6 +35,8 @@ def main(
     context_size: Annotated[Optional[int], typer.Option("--context-size", help="Context window size in tokens for Ollama")] = None,
     chunk_size: Annotated[Optional[int], typer.Option("--chunk-size")] = None,
     chunk_overlap: Annotated[Optional[int], typer.Option("--chunk-overlap")] = None,
+    concurrency: Annotated[Optional[int], typer.Option("--concurrency", help="Chunks translated in parallel")] = None,
+    batch_chunks: Annotated[Optional[int], typer.Option("--batch-chunks", help="Chunks grouped per request")] = None,
 ) -> None:
     """Translate a text document using local LLM models."""
     cli_overrides = {
@@ -50,8 +44,23 @@ def main(
         "source_code": source_code, "target_lang": target_lang,
         "target_code": target_code, "context_size": context_size,
         "chunk_size": chunk_size, "chunk_overlap": chunk_overlap,
+        "concurrency": concurrency, "batch_chunks": batch_chunks,
     }
     
+    # Deferred: pulls in httpx and rich.progress, which the --help and
+    # argument-error paths never need
+    from rich.progress import (
+        BarColumn,
+        Progress,
+        SpinnerColumn,
+        TaskProgressColumn,
+        TextColumn,
+        TimeElapsedColumn,
+    )
+
+    from .translator import Translator
+
+    translator = None
     try:
         settings = load_config(config_file, cli_overrides)
         out = output_file or input_file.parent / f"{input_file.stem}_{settings.target_code}{input_file.suffix}"
@@ -62,33 +71,55 @@ def main(
                       f"  Translation: [cyan]{settings.source_lang} → {settings.target_lang}[/cyan]\n" 
                       f"  Input: [green]{input_file}[/green] | Output: [green]{out}[/green]\n")
 
-        text = input_file.read_text(encoding="utf-8")
-        if not text.strip(): return
-        
+        if input_file.stat().st_size == 0: return
+
         translator = Translator(settings)
-        chunks = translator.split_text(text)
-        translated_chunks = []
-        
-        with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(),
-                      TaskProgressColumn(), TimeElapsedColumn(), console=console) as progress:
-            task = progress.add_task("Translating...", total=len(chunks))
-            for i, total, translated in translator.translate_document(text):
-                translated_chunks.append(translated)
-                progress.update(task, advance=1, description=f"Chunk {i+1}/{total}")
+        # Memory-map the input so the document is never materialized as one
+        # big str; chunks are decoded from byte spans as workers pick them up
+        with open(input_file, "rb") as in_handle, \
+             mmap.mmap(in_handle.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            spans = translator.split_offsets(buf)
+            if not spans: return
+
+            with console.status(f"Loading model [cyan]{settings.model_name}[/cyan]..."):
+                translator.warmup()
+
+            # Completions arrive out of order from the worker pool; buffer
+            # them here and flush to disk as soon as the next in-order chunk
+            # is ready, so memory stays bounded and partial output survives
+            # interruption
+            pending: dict[int, str] = {}
+            next_index = 0
 
-        out.write_text("\n\n".join(translated_chunks), encoding="utf-8")
+            # Binary writer with a large buffer: chunks are encoded once here
+            # instead of going through the text-layer codec machinery
+            with open(out, "wb", buffering=1 << 20) as out_handle, \
+                 Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(),
+                          TaskProgressColumn(), TimeElapsedColumn(), console=console) as progress:
+                task = progress.add_task("Translating...", total=len(spans))
+                for i, total, translated in translator.translate_buffer(buf):
+                    pending[i] = translated
+                    while next_index in pending:
+                        if next_index > 0:
+                            out_handle.write(b"\n\n")
+                        out_handle.write(pending.pop(next_index).encode("utf-8"))
+                        out_handle.flush()
+                        next_index += 1
+                    progress.update(task, advance=1, description=f"Chunk {i+1}/{total}")
         console.print(f"\n[bold green]✓[/bold green] Translation complete!")
 
     except ConnectionError as e:
         console.print(f"\n[red]Connection error:[/red] {e}\n[yellow]Hint:[/yellow] Run: [cyan]ollama serve[/cyan]")
         raise typer.Exit(1)
     except KeyboardInterrupt:
-        console.print("\n[yellow]Cancelled. Saving partial translation...[/yellow]")
-        if translated_chunks: out.write_text("\n\n".join(translated_chunks), encoding="utf-8")
+        console.print(f"\n[yellow]Cancelled. Partial translation saved to [green]{out}[/green][/yellow]")
         raise typer.Exit(130)
     except Exception as e:
         console.print(f"\n[red]Error:[/red] {e}")
         raise typer.Exit(1)
+    finally:
+        if translator is not None:
+            translator.close()
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
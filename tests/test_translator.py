@@ -0,0 +1,35 @@
+"""Tests for the chunk splitters."""
+
+from gemma_translator.translator import _split_offsets, _split_text
+
+
+def test_split_offsets_overlap_respects_codepoint_boundaries():
+    # Regression: the overlap rewind counts raw bytes and used to start the
+    # next span on a UTF-8 continuation byte, breaking decode
+    data = ("La cigüeña añeja volará mañana según el cañón. " * 40).encode("utf-8")
+    for overlap in (10, 25, 50, 100):
+        spans = _split_offsets(data, 120, overlap)
+        assert spans
+        for start, end in spans:
+            chunk = data[start:end].decode("utf-8")  # must not raise
+            assert len(chunk.encode("utf-8")) <= 120
+
+
+def test_split_offsets_hard_cut_respects_codepoint_boundaries():
+    data = ("é" * 300).encode("utf-8")
+    spans = _split_offsets(data, 100, 0)
+    assert "".join(data[s:e].decode("utf-8") for s, e in spans) == "é" * 300
+
+
+def test_split_offsets_prefers_separator_boundaries():
+    data = (("word " * 30).strip() + "\n\n") * 5
+    spans = _split_offsets(data.encode("utf-8"), 200, 0)
+    chunks = [data.encode("utf-8")[s:e].decode("utf-8") for s, e in spans]
+    assert all(len(c) <= 200 for c in chunks)
+    assert all(c.strip() == c for c in chunks)
+
+
+def test_split_text_overlap_terminates():
+    chunks = _split_text("a" * 500, 100, 50)
+    assert chunks
+    assert all(len(c) <= 100 for c in chunks)